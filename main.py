@@ -1,22 +1,31 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, status
+from fastapi import FastAPI, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect, status
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Set
 import uuid
-import threading
-import requests
+import heapq
 import time
+import random
+import asyncio
+import aiohttp
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache, partial
+from operator import attrgetter
 from dotenv import load_dotenv
 import os
-import json
+import orjson
+from cachetools import TTLCache
 
 load_dotenv()
 
 app = FastAPI(
     title="TripSpark Recommendation Service",
     description="Composite microservice aggregating User + Catalog services",
-    version="2.0"
+    version="2.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -29,7 +38,91 @@ app.add_middleware(
 
 USER_SERVICE_URL = os.getenv("USER_URL")
 CATALOG_SERVICE_URL = os.getenv("CATALOG_URL")
-tasks = {}
+UPSTREAM_TIMEOUT = aiohttp.ClientTimeout(total=5, sock_connect=1, sock_read=4)
+HEALTH_TIMEOUT = aiohttp.ClientTimeout(total=2)
+UPSTREAM_RETRIES = 3
+UPSTREAM_CONCURRENCY = 50
+# Async task state; entries expire an hour after their last update so
+# finished results don't accumulate for the life of the process. TTLCache is
+# not thread-safe (even reads evict expired entries), so it must only be
+# touched from the event loop: handlers that use it must be async def.
+tasks = TTLCache(maxsize=10_000, ttl=3600)
+
+# ============================================
+# SHARED HTTP SESSION
+# ============================================
+
+@app.on_event("startup")
+async def open_http_session():
+    # One keep-alive pool for every upstream call instead of a handshake per request
+    app.state.http = aiohttp.ClientSession(
+        timeout=UPSTREAM_TIMEOUT,
+        connector=aiohttp.TCPConnector(limit=200, limit_per_host=100, keepalive_timeout=75),
+    )
+
+@app.on_event("shutdown")
+async def close_http_session():
+    await app.state.http.close()
+
+_upstream_slots = defaultdict(lambda: asyncio.Semaphore(UPSTREAM_CONCURRENCY))
+
+async def upstream_get(base_url: str, path: str, params: Optional[Dict[str, str]] = None):
+    """GET an upstream JSON resource; returns the body, or None on a 404.
+
+    Any other error status raises aiohttp.ClientResponseError, so callers
+    report the upstream as unavailable rather than the resource as missing.
+
+    Concurrency is capped per upstream, and dropped/refused connections are
+    retried with jittered exponential backoff. Timeouts are not retried so a
+    slow upstream cannot stretch a request past its time budget.
+    """
+    async with _upstream_slots[base_url]:
+        for attempt in range(UPSTREAM_RETRIES):
+            try:
+                async with app.state.http.get(f"{base_url}{path}", params=params) as res:
+                    if res.status == 404:
+                        return None
+                    res.raise_for_status()
+                    return await res.json()
+            except aiohttp.ClientConnectionError as e:
+                if isinstance(e, aiohttp.ServerTimeoutError) or attempt == UPSTREAM_RETRIES - 1:
+                    raise
+                await asyncio.sleep(random.uniform(0, min(1.0, 0.1 * 2 ** attempt)))
+
+# ============================================
+# UPSTREAM CACHE
+# ============================================
+
+USER_CACHE = TTLCache(maxsize=10_000, ttl=60)
+PROFILE_CACHE = TTLCache(maxsize=10_000, ttl=60)
+POI_CACHE = TTLCache(maxsize=10_000, ttl=30)
+# Fetches currently running for a cache miss, keyed by (cache, key) so the
+# same id in different caches (user vs profile) never shares a fetch
+_fetches: Dict[Any, asyncio.Task] = {}
+_MISSING = object()
+
+def _finish_fetch(cache: TTLCache, key, task: asyncio.Task):
+    _fetches.pop((id(cache), key), None)
+    # Only successes are cached; a failure is shared by the callers that
+    # were waiting on it and the next miss tries again
+    if not task.cancelled() and task.exception() is None:
+        cache[key] = task.result()
+
+async def cached_fetch(cache: TTLCache, key, fetch, *args):
+    """Return cache[key]; concurrent misses share a single fetch(*args) and its outcome."""
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    flight = (id(cache), key)
+    task = _fetches.get(flight)
+    if task is None:
+        task = asyncio.ensure_future(fetch(*args))
+        _fetches[flight] = task
+        task.add_done_callback(partial(_finish_fetch, cache, key))
+
+    # shield: one caller going away must not cancel the fetch the others await
+    return await asyncio.shield(task)
 
 # ============================================
 # RESPONSE MODELS
@@ -45,6 +138,18 @@ class RecommendationResponse(BaseModel):
     catalog_data: Dict[str, Any]
     _links: Dict[str, str]
 
+class BatchRecommendationRequest(BaseModel):
+    user_ids: List[str] = Field(min_length=1, max_length=100)
+    destination: Optional[str] = None
+    vibes: List[str] = []
+    budget: Optional[str] = None
+
+class BatchRecommendationResponse(BaseModel):
+    destination: str
+    generated_at: datetime
+    recommendations: Dict[str, List[Dict[str, Any]]]
+    errors: Dict[str, str]
+
 class AsyncTaskResponse(BaseModel):
     task_id: str
     status: str
@@ -64,24 +169,32 @@ class TaskStatusResponse(BaseModel):
 class UserServiceClient:
 
     @staticmethod
-    def get_user(user_id: str):
+    async def get_user(user_id: str):
+        return await cached_fetch(USER_CACHE, user_id, UserServiceClient._fetch_user, user_id)
+
+    @staticmethod
+    async def _fetch_user(user_id: str):
         try:
-            res = requests.get(f"{USER_SERVICE_URL}/users/{user_id}", timeout=5)
-            if res.status_code == 200:
-                return res.json()
-            raise HTTPException(status_code=404, detail="User not found")
-        except Exception:
+            user = await upstream_get(USER_SERVICE_URL, f"/users/{user_id}")
+        except (aiohttp.ClientError, asyncio.TimeoutError):
             raise HTTPException(status_code=503, detail="User service unavailable")
+        if user is None:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user
 
     @staticmethod
-    def get_profile(user_id: str):
+    async def get_profile(user_id: str):
+        return await cached_fetch(PROFILE_CACHE, user_id, UserServiceClient._fetch_profile, user_id)
+
+    @staticmethod
+    async def _fetch_profile(user_id: str):
         try:
-            res = requests.get(f"{USER_SERVICE_URL}/users/{user_id}/profile", timeout=5)
-            if res.status_code == 200:
-                return res.json()
-            raise HTTPException(status_code=404, detail="Profile not found")
-        except Exception:
+            profile = await upstream_get(USER_SERVICE_URL, f"/users/{user_id}/profile")
+        except (aiohttp.ClientError, asyncio.TimeoutError):
             raise HTTPException(status_code=503, detail="User service unavailable")
+        if profile is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return profile
 
 # ============================================
 # CATALOG CLIENT
@@ -90,107 +203,238 @@ class UserServiceClient:
 class CatalogServiceClient:
 
     @staticmethod
-    def get_pois(city: Optional[str] = None, tags: List[str] = None, budget: Optional[str] = None):
+    async def get_pois(city: Optional[str] = None, tags: List[str] = None, budget: Optional[str] = None):
         params = {}
         if city: params["city"] = city
         if tags: params["tags"] = ",".join(tags)
         if budget: params["budget"] = budget
 
+        key = (city, tuple(sorted(tags)) if tags else (), budget)
+        return await cached_fetch(POI_CACHE, key, CatalogServiceClient._fetch_pois, params)
+
+    @staticmethod
+    async def _fetch_pois(params: Dict[str, str]):
         try:
-            res = requests.get(f"{CATALOG_SERVICE_URL}/pois", params=params, timeout=5)
-            if res.status_code == 200:
-                return res.json().get("pois", [])
-            return []
-        except:
-            return []
+            catalog = await upstream_get(CATALOG_SERVICE_URL, "/pois", params)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            raise HTTPException(status_code=503, detail="Catalog service unavailable")
+        if catalog is None:
+            raise HTTPException(status_code=404, detail="POIs not found")
+        return catalog.get("pois", [])
 
 # ============================================
 # RECOMMENDATION ENGINE
 # ============================================
 
+def split_tags(value: str) -> Set[str]:
+    """Parse a comma-separated catalog field into a set of stripped tags."""
+    return {tag for tag in map(str.strip, value.split(",")) if tag}
+
+@dataclass(slots=True)
+class ScoredPOI:
+    """Scoring record; only the winners are expanded into response dicts."""
+    poi: Dict[str, Any]
+    score: float
+    matching_tags: Set[str]
+    matching_vibes: Set[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        poi = self.poi
+        return {
+            "poi_id": poi.get("poi"),
+            "name": poi.get("poi"),
+            "city": poi.get("city"),
+            "country": poi.get("country"),
+            "location": {
+                "latitude": poi.get("latitude"),
+                "longitude": poi.get("longitude"),
+            },
+            "spending": poi.get("spending"),
+            "budget": poi.get("budget"),
+            "rating": poi.get("rating"),
+            "score": self.score,
+            "matching_tags": list(self.matching_tags),
+            "matching_vibes": list(self.matching_vibes),
+        }
+
+# Identical requests already being computed, and recently finished ones,
+# keyed by request signature
+_inflight: Dict[Any, asyncio.Task] = {}
+RESULT_CACHE = TTLCache(maxsize=10_000, ttl=30)
+
+def _finish_flight(key, task: asyncio.Task):
+    _inflight.pop(key, None)
+    if not task.cancelled() and task.exception() is None:
+        RESULT_CACHE[key] = task.result()
+
 class RecommendationEngine:
 
     def __init__(self):
         self.user_client = UserServiceClient()
         self.catalog_client = CatalogServiceClient()
 
-    def generate_recommendations(self, user_id, destination, vibes, budget):
+    async def generate_recommendations(self, user_id, destination, vibes, budget, on_progress=None):
+        # Single-flight: concurrent callers with the same signature share one
+        # upstream fan-out instead of each issuing their own, and repeats
+        # within 30s reuse its result. Only the caller that starts the work
+        # receives on_progress updates.
+        key = (user_id, destination, tuple(sorted(vibes)), budget)
+        result = RESULT_CACHE.get(key)
+        if result is not None:
+            return result
+
+        task = _inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._generate_recommendations(user_id, destination, vibes, budget, on_progress)
+            )
+            _inflight[key] = task
+            task.add_done_callback(partial(_finish_flight, key))
 
-        results = {}
-        errors = {}
+        # shield: one caller disconnecting must not cancel the shared work
+        return await asyncio.shield(task)
 
-        # THREAD 1 — USER
-        def fetch_user():
-            try:
-                user = self.user_client.get_user(user_id)
-                profile = self.user_client.get_profile(user_id)
-                results["profile"] = profile
-            except Exception as e:
-                errors["user"] = str(e)
-
-        # THREAD 2 — CATALOG
-        def fetch_catalog():
-            try:
-                pois = self.catalog_client.get_pois(
-                    city=destination,
-                    tags=vibes,
-                    budget=budget
-                )
-                results["pois"] = pois
-            except Exception as e:
-                errors["catalog"] = str(e)
+    async def _generate_recommendations(self, user_id, destination, vibes, budget, on_progress=None):
+
+        # The data fetches double as the logical FK checks, so user, profile
+        # and catalog are all requested at once instead of probing first
+        fetches = [
+            asyncio.ensure_future(self.user_client.get_user(user_id)),
+            asyncio.ensure_future(self.user_client.get_profile(user_id)),
+            asyncio.ensure_future(self.catalog_client.get_pois(
+                city=destination,
+                tags=vibes,
+                budget=budget
+            )),
+        ]
 
-        t1 = threading.Thread(target=fetch_user)
-        t2 = threading.Thread(target=fetch_catalog)
-        t1.start(); t2.start()
-        t1.join(); t2.join()
+        # Report progress as each fetch lands, while the rest are still pending
+        if on_progress:
+            done = 0
 
+            def advance(_):
+                nonlocal done
+                done += 1
+                on_progress(round(0.1 + 0.8 * done / len(fetches), 2))
+
+            for fetch in fetches:
+                fetch.add_done_callback(advance)
+
+        user, profile, pois = await asyncio.gather(*fetches, return_exceptions=True)
+
+        if isinstance(user, HTTPException) and user.status_code == 404:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Foreign key constraint failed: user_id '{user_id}' does not exist in User Service"
+            )
+
+        # Any other client error (e.g. 503 User service unavailable) is
+        # surfaced as-is, as the standalone FK check used to do
+        for result in (user, profile):
+            if isinstance(result, HTTPException):
+                raise result
+
+        pois = self._pois_or_fk_error(pois, destination)
+
+        errors = {}
+        for result in (user, profile):
+            if isinstance(result, Exception):
+                errors["user"] = str(result)
         if errors:
             raise HTTPException(status_code=500, detail=errors)
 
-        recs = self._compute_recommendations(results, vibes, budget)
-
-        return {
-            "user_profile": results["profile"],
-            "catalog_data": {"pois": results["pois"]},
-            "recommendations": recs
+        data = {
+            "user_profile": profile,
+            "catalog_data": {"pois": pois},
         }
+        data["recommendations"] = self._compute_recommendations(data, vibes, budget)
+        return data
+
+    async def generate_batch_recommendations(self, user_ids, destination, vibes, budget):
+        """Rank one catalog query for many users: POIs are fetched and parsed once."""
+        pois, *profiles = await asyncio.gather(
+            self.catalog_client.get_pois(
+                city=destination,
+                tags=vibes,
+                budget=budget
+            ),
+            *(self.user_client.get_profile(user_id) for user_id in user_ids),
+            return_exceptions=True
+        )
+
+        pois = self._pois_or_fk_error(pois, destination)
+
+        parsed_pois = self._parse_pois(pois)
+        results = {}
+        errors = {}
+        for user_id, profile in zip(user_ids, profiles):
+            if isinstance(profile, HTTPException):
+                errors[user_id] = profile.detail
+            elif isinstance(profile, Exception):
+                errors[user_id] = str(profile)
+            else:
+                results[user_id] = self._rank_pois(profile, parsed_pois, vibes)
+
+        return results, errors
 
     # -------------------------------------------
     # MATCHING + SCORING
     # -------------------------------------------
 
+    def _pois_or_fk_error(self, pois, destination):
+        # A failed catalog fetch for a named destination is a broken FK;
+        # without one the recommendations just go ahead with no POIs
+        if isinstance(pois, Exception):
+            if destination:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Foreign key constraint failed: destination '{destination}' is not recognized by Catalog Service"
+                )
+            return []
+        return pois
+
     def _compute_recommendations(self, data, vibes, budget):
-        profile = data["user_profile"]
-        pois = data["catalog_data"]["pois"]
+        pois = self._parse_pois(data["catalog_data"]["pois"])
+        return self._rank_pois(data["user_profile"], pois, vibes)
+
+    def _parse_pois(self, pois):
+        """Split each POI's catalog tag fields once so any number of users can be ranked against them."""
+        parsed = []
+        for poi in pois[:50]:
+            poi_vibes = split_tags(poi.get("vibes", ""))
+            poi_tags = poi_vibes | split_tags(poi.get("activities", "")) | split_tags(poi.get("food", ""))
+            parsed.append((poi, poi_vibes, poi_tags))
+        return parsed
 
-        user_vibes = set(profile.get("preferred_vibes", []))
-        user_food = set(profile.get("favorite_foods", []))
-        user_activities = set(profile.get("favorite_activities", []))
-        user_tags = user_vibes | user_food | user_activities
+    def _rank_pois(self, profile, parsed_pois, vibes):
+        user_vibes = frozenset(profile.get("preferred_vibes", []))
+        user_tags = user_vibes.union(
+            profile.get("favorite_foods", []),
+            profile.get("favorite_activities", [])
+        )
 
-        request_vibes = set([v.strip() for v in vibes]) if vibes else set()
-        effective_vibes = user_vibes | request_vibes
+        effective_vibes = user_vibes.union(v.strip() for v in vibes)
 
         user_budget_pref = profile.get("spending_preference")
         user_daily_budget = profile.get("daily_budget_limit")
 
+        # With no profile interests and no requested vibes every intersection
+        # is empty, so only budget and rating can score
+        match_tags = bool(user_tags or effective_vibes)
+        matching_tags = matching_vibes = frozenset()
+
         recommendations = []
 
-        for poi in pois[:50]:
+        for poi, poi_vibes, poi_tags in parsed_pois:
 
             score = 0
 
-            poi_vibes = set([v.strip() for v in poi.get("vibes", "").split(",") if v.strip()])
-            poi_activities = set([a.strip() for a in poi.get("activities", "").split(",") if a.strip()])
-            poi_food = set([f.strip() for f in poi.get("food", "").split(",") if f.strip()])
-            poi_tags = poi_vibes | poi_activities | poi_food
+            if match_tags:
+                matching_tags = poi_tags & user_tags
+                score += len(matching_tags) * 2
 
-            matching_tags = poi_tags & user_tags
-            score += len(matching_tags) * 2
-
-            matching_vibes = poi_vibes & effective_vibes
-            score += len(matching_vibes)
+                matching_vibes = poi_vibes & effective_vibes
+                score += len(matching_vibes)
 
             if user_budget_pref and poi.get("spending") == user_budget_pref:
                 score += 3
@@ -202,64 +446,127 @@ class RecommendationEngine:
             score += (poi.get("rating", 0) / 5) * 2
 
             if score > 0:
-                recommendations.append({
-                    "poi_id": poi.get("poi"),
-                    "name": poi.get("poi"),
-                    "city": poi.get("city"),
-                    "country": poi.get("country"),
-                    "location": {
-                        "latitude": poi.get("latitude"),
-                        "longitude": poi.get("longitude"),
-                    },
-                    "spending": poi.get("spending"),
-                    "budget": poi.get("budget"),
-                    "rating": poi.get("rating"),
-                    "score": score,
-                    "matching_tags": list(matching_tags),
-                    "matching_vibes": list(matching_vibes),
-                })
-
-        recommendations.sort(key=lambda x: x["score"], reverse=True)
-        return recommendations[:5]
+                recommendations.append(ScoredPOI(poi, score, matching_tags, matching_vibes))
+
+        top = heapq.nlargest(5, recommendations, key=attrgetter("score"))
+        return [rec.to_dict() for rec in top]
+
+engine = RecommendationEngine()
 
 # ============================================
 # ASYNC BACKGROUND TASK
 # ============================================
 
-def generate_async_task(task_id, user_id, destination, vibes, budget):
+TASK_DONE = ("completed", "failed")
+TASK_WAIT_TIMEOUT = 15
+# One-shot events for tasks that have someone waiting on their next update
+_task_events: Dict[str, asyncio.Event] = {}
+
+def set_task(task_id, state):
+    # Terminal states are final: the shielded engine work can outlive a
+    # cancelled task and would otherwise report progress over "failed"
+    current = tasks.get(task_id)
+    if current is not None and current["status"] in TASK_DONE:
+        return
+    tasks[task_id] = state
+    event = _task_events.pop(task_id, None)
+    if event:
+        event.set()
+
+async def task_updates(task_id):
+    """Yield a task's state now and again after every change until it finishes.
+
+    Waits are bounded by TASK_WAIT_TIMEOUT so a task that disappears from the
+    cache (expired or evicted) still ends the stream instead of hanging it.
+    """
+    last = None
+    while True:
+        task = tasks.get(task_id)
+        if task is None:
+            _task_events.pop(task_id, None)
+            return
+        done = task["status"] in TASK_DONE
+        if not done:
+            # Register before yielding so an update made while the consumer
+            # is sending this frame still wakes the wait below
+            event = _task_events.setdefault(task_id, asyncio.Event())
+        if task is not last:
+            yield task
+            last = task
+        if done:
+            return
+        try:
+            await asyncio.wait_for(event.wait(), TASK_WAIT_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+
+def task_status_payload(task_id, task) -> bytes:
+    return orjson.dumps(TaskStatusResponse.model_construct(task_id=task_id, **task).model_dump())
+
+async def generate_async_task(task_id, user_id, destination, vibes, budget):
     try:
-        tasks[task_id] = {"status": "processing", "progress": 0.1}
-        time.sleep(1)
+        set_task(task_id, {"status": "processing", "progress": 0.1})
 
-        engine = RecommendationEngine()
-        result = engine.generate_recommendations(user_id, destination, vibes, budget)
+        def on_progress(progress):
+            set_task(task_id, {"status": "processing", "progress": progress})
 
-        tasks[task_id] = {
+        result = await engine.generate_recommendations(
+            user_id, destination, vibes, budget, on_progress
+        )
+
+        set_task(task_id, {
             "status": "completed",
             "progress": 1.0,
             "result": result,
-            "completed_at": datetime.now().isoformat()
-        }
+            "completed_at": time.time()
+        })
 
     except Exception as e:
-        tasks[task_id] = {"status": "failed", "error": str(e)}
+        set_task(task_id, {"status": "failed", "error": str(e)})
+    except BaseException:
+        # Cancelled (e.g. on shutdown): still leave a terminal state so pollers
+        # and streams stop waiting on it
+        set_task(task_id, {"status": "failed", "error": "Task cancelled."})
+        raise
 
 # ============================================
 # ENDPOINTS
 # ============================================
 
+async def service_up(base_url: str) -> bool:
+    try:
+        async with app.state.http.get(f"{base_url}/health", timeout=HEALTH_TIMEOUT) as res:
+            return res.status == 200
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return False
+
 @app.get("/health")
-def health():
+async def health():
+    user_up, catalog_up = await asyncio.gather(
+        service_up(USER_SERVICE_URL),
+        service_up(CATALOG_SERVICE_URL)
+    )
     return {
         "status": "ok",
         "timestamp": datetime.utcnow(),
         "services": {
-            "user": requests.get(f"{USER_SERVICE_URL}/health").status_code == 200,
-            "catalog": requests.get(f"{CATALOG_SERVICE_URL}/health").status_code == 200,
+            "user": user_up,
+            "catalog": catalog_up,
         }
     }
 
 # data
+SAMPLE_DATA_PATH = "data/sample.json"
+
+@lru_cache(maxsize=1)
+def _load_sample_data(mtime_ns: int):
+    # mtime is only the cache key: an edited file gets re-read, otherwise not
+    with open(SAMPLE_DATA_PATH, "rb") as f:
+        return orjson.loads(f.read())
+
+def load_sample_data():
+    return _load_sample_data(os.stat(SAMPLE_DATA_PATH).st_mtime_ns)
+
 @app.get("/recommendations/{user_name}")
 def get_recommendation(
     user_name: str,
@@ -268,9 +575,7 @@ def get_recommendation(
     budget: Optional[str] = None
 ):
     try:
-        with open("data/sample.json", "r") as f:
-            data = json.load(f)
-        return data
+        return load_sample_data()
     except Exception as e:
         return {"error": str(e)}
 
@@ -280,53 +585,25 @@ def get_recommendation(
 # ==========================================================
 
 @app.get("/recommendations/{user_id}", response_model=RecommendationResponse)
-def get_recommendations(
+async def get_recommendations(
     user_id: str,
     destination: Optional[str] = None,
     vibes: str = "",
     budget: Optional[str] = None
 ):
     # -------------------------------
-    # LOGICAL FOREIGN KEY CONSTRAINT
-    # -------------------------------
-
-    # 1. Validate user_id exists → FK check
-    try:
-        UserServiceClient().get_user(user_id)
-    except HTTPException as e:
-        if e.status_code == 404:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Foreign key constraint failed: user_id '{user_id}' does not exist in User Service"
-            )
-        raise
-
-    # 2. Optional: validate that destination city exists in catalog
-    if destination:
-        try:
-            test_catalog = requests.get(
-                f"{CATALOG_SERVICE_URL}/pois",
-                params={"city": destination},
-                timeout=5
-            )
-            if test_catalog.status_code != 200:
-                raise Exception()
-        except:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Foreign key constraint failed: destination '{destination}' is not recognized by Catalog Service"
-            )
-
-    # -------------------------------
-    # Continue with recommendation logic
+    # LOGICAL FOREIGN KEY CONSTRAINTS
     # -------------------------------
+    # user_id and destination are validated by the engine's concurrent
+    # user/profile/catalog fetch rather than by separate probe requests
     vibes_list = [v.strip() for v in vibes.split(",")] if vibes else []
-    engine = RecommendationEngine()
-    result = engine.generate_recommendations(user_id, destination, vibes_list, budget)
+    result = await engine.generate_recommendations(user_id, destination, vibes_list, budget)
 
     rec_id = str(uuid.uuid4())
 
-    return RecommendationResponse(
+    # Every field is produced by this service, so skip re-validating it here;
+    # FastAPI still checks the result against response_model on the way out
+    return RecommendationResponse.model_construct(
         recommendation_id=rec_id,
         user_id=user_id,
         destination=destination or "general",
@@ -341,12 +618,33 @@ def get_recommendations(
         }
     )
 
+# ==========================================================
+#  BATCH RECOMMENDATIONS
+# ==========================================================
+
+@app.post("/recommendations/batch", response_model=BatchRecommendationResponse)
+async def batch_recommendations(req: BatchRecommendationRequest):
+    # One catalog query and one scoring setup shared by every user; users whose
+    # profile can't be fetched are reported in errors instead of failing the batch
+    user_ids = list(dict.fromkeys(req.user_ids))
+    vibes_list = [v.strip() for v in req.vibes]
+    recommendations, errors = await engine.generate_batch_recommendations(
+        user_ids, req.destination, vibes_list, req.budget
+    )
+
+    return BatchRecommendationResponse.model_construct(
+        destination=req.destination or "general",
+        generated_at=datetime.now(),
+        recommendations=recommendations,
+        errors=errors
+    )
+
 # ==========================================================
 #  ASYNC RECOMMENDATIONS — FK VALIDATION
 # ==========================================================
 
 @app.post("/recommendations/async/{user_id}", status_code=202, response_model=AsyncTaskResponse)
-def start_async(
+async def start_async(
     user_id: str,
     background_tasks: BackgroundTasks,
     destination: Optional[str] = None,
@@ -358,7 +656,7 @@ def start_async(
     # LOGICAL FK CONSTRAINT (user_id)
     # -------------------------------
     try:
-        UserServiceClient().get_user(user_id)
+        await engine.user_client.get_user(user_id)
     except HTTPException as e:
         if e.status_code == 404:
             raise HTTPException(
@@ -370,7 +668,7 @@ def start_async(
     task_id = str(uuid.uuid4())
     vibes_list = [v.strip() for v in vibes.split(",")] if vibes else []
 
-    tasks[task_id] = {"status": "accepted", "progress": 0.0}
+    set_task(task_id, {"status": "accepted", "progress": 0.0})
 
     background_tasks.add_task(
         generate_async_task,
@@ -385,10 +683,38 @@ def start_async(
     )
 
 @app.get("/recommendations/status/{task_id}", response_model=TaskStatusResponse)
-def task_status(task_id: str):
+async def task_status(task_id: str):
+    task = tasks.get(task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found.")
+    return TaskStatusResponse.model_construct(task_id=task_id, **task)
+
+# Push alternatives to polling: one frame per status change, ending once the
+# task completes or fails
+
+@app.get("/recommendations/sse/{task_id}")
+async def task_status_sse(task_id: str):
     if task_id not in tasks:
         raise HTTPException(status_code=404, detail="Task not found.")
-    return TaskStatusResponse(task_id=task_id, **tasks[task_id])
+
+    async def events():
+        async for task in task_updates(task_id):
+            yield b"data: " + task_status_payload(task_id, task) + b"\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.websocket("/recommendations/stream/{task_id}")
+async def task_status_ws(websocket: WebSocket, task_id: str):
+    await websocket.accept()
+    if task_id not in tasks:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Task not found.")
+        return
+    try:
+        async for task in task_updates(task_id):
+            await websocket.send_text(task_status_payload(task_id, task).decode())
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
 
 @app.get("/")
 def root():
@@ -401,4 +727,10 @@ def root():
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8080)))
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", 8080)),
+        loop="uvloop",
+        http="httptools"
+    )
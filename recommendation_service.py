@@ -1,9 +1,19 @@
 import uuid
+import heapq
 from datetime import datetime
+from itertools import chain
+from operator import itemgetter
 from typing import List, Dict, Any, Optional
 from database import db
 from models import POI, RecommendationRequest, RecommendationResponse
 
+# (time_of_day, description template, estimated_price) for each day of an itinerary
+ITINERARY_DAY_TEMPLATE = (
+    ("Morning", "Explore {destination}'s highlights", "$10-50"),
+    ("Afternoon", "Visit places matching your vibes: {vibes}", "$10-50"),
+    ("Evening", "Dinner / Relaxation", "$15-60"),
+)
+
 class RecommendationService:
 
     # ------------------------------
@@ -11,34 +21,35 @@ class RecommendationService:
     # ------------------------------
     def _extract_poi_tags(self, poi: Dict[str, Any]) -> set:
         """Convert comma-separated vibes/activities/food into a unified tag set."""
-        vibes = [v.strip() for v in poi.get("vibes", "").split(",") if v.strip()]
-        activities = [a.strip() for a in poi.get("activities", "").split(",") if a.strip()]
-        food = [f.strip() for f in poi.get("food", "").split(",") if f.strip()]
-
-        return set(vibes + activities + food)
+        fields = (poi.get("vibes", ""), poi.get("activities", ""), poi.get("food", ""))
+        return {
+            tag
+            for tag in map(str.strip, chain.from_iterable(f.split(",") for f in fields))
+            if tag
+        }
 
-    def _compute_score(self, poi: Dict[str, Any], request: RecommendationRequest, user_profile: Dict[str, Any]) -> int:
-        """Compute recommendation score aligned with UserProfile + Catalog models."""
+    def _compute_score(
+        self,
+        poi: Dict[str, Any],
+        poi_tags: set,
+        user_tags: frozenset,
+        request_vibes: frozenset,
+        user_profile: Dict[str, Any]
+    ) -> int:
+        """Compute recommendation score aligned with UserProfile + Catalog models.
+
+        poi_tags, user_tags and request_vibes are built once per request by the caller.
+        """
         score = 0
 
-        # ---- Extract tags from POI ----
-        poi_tags = self._extract_poi_tags(poi)
-
-        # ---- Build user interest tag set ----
-        user_tags = set(user_profile.get("preferred_vibes", [])) \
-                    | set(user_profile.get("favorite_foods", [])) \
-                    | set(user_profile.get("favorite_activities", []))
-
-        # ---- Vibes passed in request ----
-        request_vibes = set(request.vibes)
+        if poi_tags and (user_tags or request_vibes):
+            # ---- Match tags ----
+            matching_tags = poi_tags & user_tags
+            score += len(matching_tags) * 2
 
-        # ---- Match tags ----
-        matching_tags = poi_tags & user_tags
-        score += len(matching_tags) * 2
-
-        # ---- Match request vibes ----
-        matching_vibes = poi_tags & request_vibes
-        score += len(matching_vibes)
+            # ---- Match request vibes ----
+            matching_vibes = poi_tags & request_vibes
+            score += len(matching_vibes)
 
         # ---- Spending preference (textual: low/medium/high) ----
         user_spending = user_profile.get("spending_preference")
@@ -73,8 +84,9 @@ class RecommendationService:
             location=request.destination
         )
 
-        # Convert raw DB entries → POI objects
-        pois = [POI(**poi) for poi in pois_data]
+        # Parse each POI's vibes/activities/food into a tag set once,
+        # indexed like pois_data so the rows themselves stay untouched
+        poi_tag_sets = [self._extract_poi_tags(poi) for poi in pois_data]
 
         # ------------------------------
         # STEP 2: Score POIs
@@ -90,43 +102,48 @@ class RecommendationService:
             "daily_budget_limit": None
         }
 
-        for poi in pois_data:
-            score = self._compute_score(poi, request, user_profile)
-            if score > 0:
-                poi_entry = poi.copy()
-                poi_entry["score"] = score
-                scored_pois.append(poi_entry)
-
-        # Sort by descending score
-        scored_pois.sort(key=lambda x: x["score"], reverse=True)
+        # ---- Build user interest + request vibe sets once, not per POI ----
+        user_tags = frozenset(user_profile.get("preferred_vibes", [])).union(
+            user_profile.get("favorite_foods", []),
+            user_profile.get("favorite_activities", [])
+        )
+        request_vibes = frozenset(request.vibes)
 
-        # Convert top POIs back to models
-        top_pois = [POI(**p) for p in scored_pois[:5]]
+        for index, poi in enumerate(pois_data):
+            score = self._compute_score(poi, poi_tag_sets[index], user_tags, request_vibes, user_profile)
+            if score > 0:
+                scored_pois.append((score, index))
+
+        # Keep the 5 best by descending score
+        top_scored = heapq.nlargest(5, scored_pois, key=itemgetter(0))
+
+        # Only the winners become models; DB rows are trusted, so skip validation.
+        # model_construct keeps whatever it is given, so pass only POI's fields.
+        top_pois = [
+            POI.model_construct(**{
+                name: pois_data[index][name]
+                for name in POI.model_fields
+                if name in pois_data[index]
+            })
+            for _, index in top_scored
+        ]
 
         # ------------------------------
         # STEP 3: Generate Itinerary
         # ------------------------------
         itinerary = None
         if request.days > 1:
-            itinerary = {}
-            for day in range(1, request.days + 1):
-                itinerary[f"day_{day}"] = [
-                    {
-                        "time_of_day": "Morning",
-                        "description": f"Explore {request.destination}'s highlights",
-                        "estimated_price": "$10-50"
-                    },
-                    {
-                        "time_of_day": "Afternoon",
-                        "description": f"Visit places matching your vibes: {', '.join(request.vibes)}",
-                        "estimated_price": "$10-50"
-                    },
-                    {
-                        "time_of_day": "Evening",
-                        "description": "Dinner / Relaxation",
-                        "estimated_price": "$15-60"
-                    }
-                ]
+            vibes = ", ".join(request.vibes)
+            day_plan = [
+                {
+                    "time_of_day": time_of_day,
+                    "description": description.format(destination=request.destination, vibes=vibes),
+                    "estimated_price": estimated_price
+                }
+                for time_of_day, description, estimated_price in ITINERARY_DAY_TEMPLATE
+            ]
+            # Every day gets the same plan, so the days share one list
+            itinerary = {f"day_{day}": day_plan for day in range(1, request.days + 1)}
 
         # ------------------------------
         # STEP 4: Save Recommendation
@@ -139,14 +156,14 @@ class RecommendationService:
             "destination": request.destination,
             "vibes": request.vibes,
             "budget": request.budget,
-            "pois": [poi.dict() for poi in top_pois],
+            "pois": [poi.model_dump() for poi in top_pois],
             "itinerary": itinerary
         })
 
         # ------------------------------
         # STEP 5: Return Response
         # ------------------------------
-        return RecommendationResponse(
+        return RecommendationResponse.model_construct(
             recommendation_id=recommendation_id,
             user_id=request.user_id or "anonymous",
             destination=request.destination,